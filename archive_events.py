@@ -0,0 +1,56 @@
+import argparse
+import os
+from datetime import datetime, timedelta
+from app import create_app, init_db
+from extensions import db
+from events import FIELDS, last_archived_id, write_archive
+from models import CirculationEvent
+
+# Chuyển các sự kiện cũ từ bảng circulation_event sang file lưu trữ nén (.bin.gz):
+#   python archive_events.py --days 90
+
+def archive(app, days):
+    """Ghi các sự kiện cũ hơn days ngày ra file rồi xóa khỏi bảng; trả về (đường dẫn, số sự kiện)"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    # Cắt theo id chứ không theo created_at: created_at lấy trước khi có khóa ghi nên có thể
+    # không tăng theo id, lưu trữ phải là một khoảng id liền nhau để replay giữ đúng thứ tự
+    last_id = db.session.query(db.func.max(CirculationEvent.id)).filter(CirculationEvent.created_at < cutoff).scalar()
+    if last_id is None:
+        return None, 0
+    folder = app.config['EVENT_ARCHIVE_FOLDER']
+    # Lần chạy trước có thể đã ghi file nhưng chưa kịp xóa khỏi bảng: bỏ qua phần đã lưu trữ
+    archived_id = last_archived_id(folder)
+    query = CirculationEvent.query.filter(CirculationEvent.id > archived_id, CirculationEvent.id <= last_id).order_by(CirculationEvent.id)
+    events = [{c: getattr(e, c) for c in ('id', 'kind', 'created_at') + FIELDS} for e in query.yield_per(1000)]
+
+    path = None
+    if events:
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"events-{events[0]['id']:010d}-{events[-1]['id']:010d}.bin.gz")
+        if os.path.exists(path):
+            raise FileExistsError(f'File lưu trữ {path} đã tồn tại, không ghi đè. Kiểm tra lại id sự kiện trong DB.')
+        write_archive(path + '.tmp', events)
+        os.replace(path + '.tmp', path)  # chỉ xóa khỏi DB khi file đã ghi xong
+
+    CirculationEvent.query.filter(CirculationEvent.id <= max(last_id, archived_id)).delete(synchronize_session=False)
+    db.session.commit()
+    return path, len(events)
+
+def main():
+    parser = argparse.ArgumentParser(description='Lưu trữ sự kiện mượn/trả cũ ra file')
+    parser.add_argument('--days', type=int, default=90, help='lưu trữ các sự kiện cũ hơn số ngày này')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+        try:
+            path, count = archive(app, args.days)
+        except FileExistsError as e:
+            raise SystemExit(str(e))
+        if not count:
+            raise SystemExit('Không có sự kiện nào cần lưu trữ.')
+        print(f"Đã lưu trữ {count} sự kiện vào {path} ({os.path.getsize(path)} byte).")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import os
+from contextlib import asynccontextmanager
+import sqlalchemy as sa
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from app import create_app
+from blueprints.books import search_statement
+from models import User
+
+# Điểm vào ASGI:
+#   flask --app wsgi init-db      # migrate: tạo các bảng còn thiếu, chạy trước mỗi lần deploy
+#   uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+# - /static (ảnh bìa, avatar, file sách tải về trong static/book_files) được Starlette
+#   phục vụ bất đồng bộ ngay trên event loop, không chiếm thread của app Flask.
+# - /api/books (tìm kiếm sách) chạy async trên event loop với driver DB async
+#   (sqlite+aiosqlite / postgresql+asyncpg), luôn đọc từ DB chính.
+# - Các route còn lại là app Flask đồng bộ, chạy trong thread pool của a2wsgi
+#   (kích thước chỉnh bằng ASGI_THREADS) vì Flask-SQLAlchemy không có session async.
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+def async_database_uri(config):
+    """URI async của DB chính: SQLALCHEMY_ASYNC_DATABASE_URI hoặc suy ra từ SQLALCHEMY_DATABASE_URI"""
+    if config.get('SQLALCHEMY_ASYNC_DATABASE_URI'):
+        return config['SQLALCHEMY_ASYNC_DATABASE_URI']
+    url = sa.make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() not in ASYNC_DRIVERS:
+        raise ValueError(f'Không có driver async cho {url.get_backend_name()!r}, đặt ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+def session_user_id(flask_app, request):
+    """Đọc user_id của Flask-Login từ cookie session đã ký của Flask, None nếu chưa đăng nhập"""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie:
+        return None
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        data = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+    return data.get('_user_id')
+
+class SearchBooks:
+    """Bản async của books.search_api; chưa đăng nhập (hoặc chỉ có cookie remember) thì
+    chuyển cho app Flask xử lý như mọi route khác (chuyển hướng tới trang đăng nhập)"""
+
+    def __init__(self, flask_app, fallback, engine):
+        self.flask_app, self.fallback, self.engine = flask_app, fallback, engine
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        user_id = session_user_id(self.flask_app, request)
+        if user_id is not None:
+            statement, page = search_statement(request.query_params)
+            async with self.engine.connect() as conn:
+                if await conn.scalar(sa.select(User.id).where(User.id == int(user_id))) is not None:
+                    books = [dict(row._mapping) for row in await conn.execute(statement)]
+                    return await JSONResponse({'page': page, 'books': books})(scope, receive, send)
+        await self.fallback(scope, receive, send)
+
+def create_asgi_app(flask_app):
+    """Bọc app Flask thành app Starlette (static + /api/books async, còn lại qua a2wsgi)"""
+    flask_asgi = WSGIMiddleware(flask_app, workers=int(os.environ.get('ASGI_THREADS', 10)))
+    engine = create_async_engine(async_database_uri(flask_app.config), **flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    return Starlette(lifespan=lifespan, routes=[
+        Route('/api/books', endpoint=SearchBooks(flask_app, flask_asgi, engine)),
+        Mount('/static', app=StaticFiles(directory=flask_app.static_folder)),
+        Mount('/', app=flask_asgi),
+    ])
+
+app = create_asgi_app(create_app(os.environ.get('LIBRARY_CONFIG', 'production')))
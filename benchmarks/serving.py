@@ -0,0 +1,154 @@
+"""So sánh thông lượng giữa chế độ WSGI (gunicorn gthread) và ASGI (uvicorn).
+
+Chạy: python benchmarks/serving.py [--seconds 10] [--concurrency 16] [--only /api/books]
+Cần cài các gói trong requirements.txt. Hai server dùng chung một bản sao DB tạm
+và cùng một tập request (trang chủ, tìm kiếm, API tìm kiếm, xem sách, ảnh tĩnh, tải file
+sách 1 MB); --only giữ lại các request có đường dẫn bắt đầu bằng tiền tố cho trước.
+"""
+import argparse
+import http.client
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SEED = r'''
+from app import create_app, create_sample_data
+from extensions import db
+from models import Book
+app = create_app('production')
+with app.app_context():
+    db.create_all()
+    create_sample_data()
+    for i in range(200):
+        db.session.add(Book(title=f'Sách {i:03d}', author_id=i % 40 + 1, category_id=i % 20 + 1,
+                            language_id=i % 20 + 1, total_quantity=5, available_quantity=5))
+    db.session.commit()
+'''
+
+REQUEST_MIX = [
+    '/',
+    '/?q_title=S%C3%A1ch+01',
+    '/api/books?q_title=S%C3%A1ch+01',
+    '/?page=5',
+    '/book/1',
+    '/book/42',
+    '/static/logo.png',
+    '/static/book_files/{book_file}',
+]
+
+SERVERS = {
+    'wsgi (gunicorn)': lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), 'wsgi:app'],
+    'asgi (uvicorn)': lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--no-access-log', '--log-level', 'warning'],
+}
+
+def wait_ready(port, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/login')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server trên cổng {port} không khởi động được')
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', '/login')
+    resp = conn.getresponse()
+    body = resp.read().decode('utf-8')
+    cookie = resp.getheader('Set-Cookie').split(';')[0]
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', body).group(1)
+    form = urllib.parse.urlencode({'csrf_token': token, 'username': 'Admin1', 'password': 'Admin777'})
+    conn.request('POST', '/login', body=form, headers={
+        'Cookie': cookie, 'Content-Type': 'application/x-www-form-urlencoded'})
+    resp = conn.getresponse()
+    resp.read()
+    return resp.getheader('Set-Cookie').split(';')[0]
+
+def load(port, cookie, seconds, concurrency, paths):
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    stop_at = time.time() + seconds
+
+    def worker(idx):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        i = idx
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            try:
+                conn.request('GET', path, headers={'Cookie': cookie})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status == 200:
+                    counts[idx] += 1
+                else:
+                    errors[idx] += 1
+            except (OSError, http.client.HTTPException):
+                errors[idx] += 1
+                conn = http.client.HTTPConnection('127.0.0.1', port)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return sum(counts), sum(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--only', default='/', help='chỉ chạy các request có đường dẫn bắt đầu bằng tiền tố này')
+    args = parser.parse_args()
+    book_file = f'bench-{os.getpid()}.pdf'
+    paths = [p.format(book_file=book_file) for p in REQUEST_MIX if p.startswith(args.only)]
+    if not paths:
+        parser.error(f'Không có request nào bắt đầu bằng {args.only!r}')
+
+    tmpdir = tempfile.mkdtemp(prefix='library-bench-')
+    # File sách tạm trong static/book_files (thư mục mà cả hai server cùng phục vụ)
+    files_dir = os.path.join(ROOT, 'static', 'book_files')
+    created_dir = not os.path.isdir(files_dir)
+    os.makedirs(files_dir, exist_ok=True)
+    with open(os.path.join(files_dir, book_file), 'wb') as f:
+        f.write(os.urandom(1024 * 1024))
+    env = dict(os.environ, LIBRARY_CONFIG='production', SECRET_KEY='bench-secret', GUNICORN_ACCESSLOG='',
+               DATABASE_URL='sqlite:///' + os.path.join(tmpdir, 'bench.db'))
+    try:
+        subprocess.run([sys.executable, '-c', SEED], cwd=ROOT, env=env, check=True, capture_output=True)
+        print(f"{'chế độ':<18}{'req/s':>10}{'ok':>10}{'lỗi':>8}")
+        for name, build_cmd in SERVERS.items():
+            proc = subprocess.Popen(build_cmd(args.port, args.workers), cwd=ROOT, env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_ready(args.port)
+                cookie = login(args.port)
+                ok, failed = load(args.port, cookie, args.seconds, args.concurrency, paths)
+                print(f"{name:<18}{ok / args.seconds:>10.1f}{ok:>10}{failed:>8}")
+            finally:
+                proc.terminate()
+                proc.wait()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        os.remove(os.path.join(files_dir, book_file))
+        if created_dir:
+            os.rmdir(files_dir)
+
+if __name__ == '__main__':
+    main()
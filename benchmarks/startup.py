@@ -0,0 +1,57 @@
+"""Đo thời gian khởi động: import nguội, create_app() và request đầu tiên.
+
+Chạy: python benchmarks/startup.py [--runs 10]
+Mỗi lần đo chạy trong một tiến trình Python mới để không bị ảnh hưởng bởi cache import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+app = app_module.create_app('testing')
+t2 = time.perf_counter()
+from extensions import db
+with app.app_context():
+    db.create_all()
+client = app.test_client()
+t3 = time.perf_counter()
+client.get('/login')
+t4 = time.perf_counter()
+client.get('/login')
+t5 = time.perf_counter()
+print(json.dumps({
+    'import': t1 - t0,
+    'create_app': t2 - t1,
+    'first_request': t4 - t3,
+    'warm_request': t5 - t4,
+}))
+'''
+
+def run_once():
+    env = dict(os.environ, LIBRARY_CONFIG='testing')
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    print(f"{'giai đoạn':<16}{'median (ms)':>14}{'min (ms)':>12}{'max (ms)':>12}")
+    for key in ('import', 'create_app', 'first_request', 'warm_request'):
+        values = [s[key] * 1000 for s in samples]
+        print(f"{key:<16}{statistics.median(values):>14.1f}{min(values):>12.1f}{max(values):>12.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+from blueprints.auth import auth_bp
+from blueprints.books import books_bp
+from blueprints.admin import admin_bp
+
+__all__ = ['auth_bp', 'books_bp', 'admin_bp']
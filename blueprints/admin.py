@@ -0,0 +1,261 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from extensions import db
+from models import Author, Book, BorrowLog, Category, Language, User
+from events import record
+from routing import read_only
+from utils import save_picture, admin_required
+
+admin_bp = Blueprint('admin', __name__)
+
+# --- NHÓM: QUẢN TRỊ & MƯỢN/TRẢ ---
+
+@admin_bp.route('/borrow_history')
+@login_required
+@admin_required
+@read_only
+def borrow_history():
+    all_logs = BorrowLog.query.order_by(BorrowLog.borrow_date.desc()).all()
+    return render_template('borrow_history.html', logs=all_logs)
+
+@admin_bp.route('/add_book')
+@login_required
+@admin_required
+def add_book_page():
+    return render_template('add_book_page.html', authors=Author.query.all(), categories=Category.query.all(), languages=Language.query.all())
+
+@admin_bp.route('/add', methods=['POST'])
+@login_required
+@admin_required
+def add_book():
+    try:
+        year = request.form['year']; price = request.form['price']
+        quantity = int(request.form.get('quantity', 1))
+        if quantity < 0: quantity = 1
+        new_book = Book(
+            title=request.form['title'], author_id=request.form['author_id'],
+            category_id=request.form['category_id'], language_id=request.form['language_id'],
+            year=int(year) if year else None, price=int(price) if price else None,
+            summary=request.form['summary'],
+            total_quantity=quantity, available_quantity=quantity
+        )
+        if 'image_file' in request.files:
+            file = request.files['image_file']
+            if file.filename != '':
+                new_book.image_file = save_picture(file, current_app.config['UPLOAD_FOLDER_BOOKS'])
+        if 'book_file' in request.files: # Xử lý file upload từ form(Tính năng mới)
+                book_file = request.files['book_file']
+                if book_file.filename != '':
+                    new_book.book_file = save_picture(book_file, current_app.config['UPLOAD_FOLDER_FILES']) # Lưu file vào thư mục đã cấu hình(tính năng mới)
+        db.session.add(new_book); db.session.flush()  # flush để có new_book.id cho sự kiện
+        record('stock_changed', book_id=new_book.id, actor_id=current_user.id, available_quantity=quantity, total_quantity=quantity)
+        db.session.commit()
+        flash('Thêm sách thành công!', 'success')
+        return redirect(url_for('books.index'))
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi: {e}', 'danger')
+        return redirect(url_for('admin.add_book_page'))
+
+@admin_bp.route('/edit/<int:id>')
+@login_required
+@admin_required
+def edit_page(id):
+    return render_template('edit.html', book=Book.query.get_or_404(id), authors=Author.query.all(), categories=Category.query.all(), languages=Language.query.all())
+
+@admin_bp.route('/update/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_book(id):
+    book = Book.query.get_or_404(id)
+    try:
+        book.title = request.form['title']
+        book.author_id = request.form['author_id']
+        book.category_id = request.form['category_id']
+        book.language_id = request.form['language_id']
+        year = request.form['year']; price = request.form['price']
+        book.year = int(year) if year else None
+        book.price = int(price) if price else None
+        book.summary = request.form['summary']
+        old_stock = (book.available_quantity, book.total_quantity)
+        new_total_quantity = int(request.form.get('quantity', book.total_quantity))
+        borrowed_count = BorrowLog.query.filter_by(book_id=book.id, return_date=None).count()
+        if new_total_quantity < borrowed_count:
+            flash(f'Không thể giảm tổng số lượng xuống {new_total_quantity}, vì đang có {borrowed_count} cuốn được mượn.', 'danger')
+        else:
+            book.total_quantity = new_total_quantity
+            book.available_quantity = new_total_quantity - borrowed_count
+            flash('Cập nhật sách thành công!', 'success')
+        if 'image_file' in request.files:
+            file = request.files['image_file']
+            if file.filename != '':
+                book.image_file = save_picture(file, current_app.config['UPLOAD_FOLDER_BOOKS'])
+# ===== CẬP NHẬT FILE SÁCH ===== (tính năng mới)
+        if 'book_file' in request.files:
+            book_file = request.files['book_file']
+            if book_file.filename != '':
+                book.book_file = save_picture(book_file,current_app.config['UPLOAD_FOLDER_FILES'])
+        new_stock = (book.available_quantity, book.total_quantity)
+        record('book_updated', book_id=id, actor_id=current_user.id)
+        if new_stock != old_stock:
+            record('stock_changed', book_id=id, actor_id=current_user.id, available_quantity=new_stock[0], total_quantity=new_stock[1])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi: {e}', 'danger')
+    return redirect(url_for('admin.edit_page', id=id))
+
+@admin_bp.route('/delete/<int:id>')
+@login_required
+@admin_required
+def delete_book(id):
+    book = Book.query.get_or_404(id)
+    if BorrowLog.query.filter_by(book_id=id, return_date=None).first():
+        flash(f'Không thể xóa sách "{book.title}" vì đang có người mượn.', 'danger')
+        return redirect(url_for('books.index'))
+    try: db.session.delete(book); record('book_deleted', book_id=id, actor_id=current_user.id); db.session.commit(); flash('Đã xóa sách.', 'success')
+    except Exception as e: db.session.rollback(); flash(f'Lỗi: {e}', 'danger')
+    return redirect(url_for('books.index'))
+
+@admin_bp.route('/manage_metadata')
+@login_required
+@admin_required
+def manage_page(): return render_template('manage.html', authors=Author.query.all(), categories=Category.query.all(), languages=Language.query.all())
+@admin_bp.route('/add_author', methods=['POST'])
+@login_required
+@admin_required
+def add_author():
+    if not Author.query.filter_by(name=request.form['author_name']).first(): db.session.add(Author(name=request.form['author_name'])); db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/add_category', methods=['POST'])
+@login_required
+@admin_required
+def add_category():
+    if not Category.query.filter_by(name=request.form['category_name']).first(): db.session.add(Category(name=request.form['category_name'])); db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/add_language', methods=['POST'])
+@login_required
+@admin_required
+def add_language():
+    if not Language.query.filter_by(name=request.form['language_name']).first(): db.session.add(Language(name=request.form['language_name'])); db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/delete_author/<int:id>')
+@login_required
+@admin_required
+def delete_author(id):
+    try: db.session.delete(Author.query.get_or_404(id)); db.session.commit()
+    except: db.session.rollback(); flash('Không thể xóa vì có sách liên quan.', 'danger')
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/delete_category/<int:id>')
+@login_required
+@admin_required
+def delete_category(id):
+    try: db.session.delete(Category.query.get_or_404(id)); db.session.commit()
+    except: db.session.rollback(); flash('Không thể xóa vì có sách liên quan.', 'danger')
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/delete_language/<int:id>')
+@login_required
+@admin_required
+def delete_language(id):
+    try: db.session.delete(Language.query.get_or_404(id)); db.session.commit()
+    except: db.session.rollback(); flash('Không thể xóa vì có sách liên quan.', 'danger')
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/edit_author/<int:id>')
+@login_required
+@admin_required
+def edit_author_page(id): return render_template('edit_author.html', author=Author.query.get_or_404(id))
+@admin_bp.route('/update_author/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_author(id):
+    Author.query.get_or_404(id).name = request.form['name']; db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/edit_category/<int:id>')
+@login_required
+@admin_required
+def edit_category_page(id): return render_template('edit_category.html', category=Category.query.get_or_404(id))
+@admin_bp.route('/update_category/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_category(id):
+    Category.query.get_or_404(id).name = request.form['name']; db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+@admin_bp.route('/edit_language/<int:id>')
+@login_required
+@admin_required
+def edit_language_page(id): return render_template('edit_language.html', language=Language.query.get_or_404(id))
+@admin_bp.route('/update_language/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_language(id):
+    Language.query.get_or_404(id).name = request.form['name']; db.session.commit()
+    return redirect(url_for('admin.manage_page'))
+
+# XEM DANH SÁCH USER
+@admin_bp.route('/manage_users')
+@login_required
+@admin_required
+def manage_users():
+    users = User.query.all()
+    return render_template('manage_users.html', users=users)
+# THÊM USER
+@admin_bp.route('/add_user', methods=['POST'])
+@login_required
+@admin_required
+def add_user():
+    user = User(
+        username=request.form['username'],
+        fullname=request.form['fullname'],
+        user_code=request.form['user_code'],
+        is_admin=('is_admin' in request.form)
+    )
+    user.set_password(request.form['password'])
+    db.session.add(user)
+    if user.is_admin:
+        db.session.flush()  # lấy user.id cho sự kiện
+        record('user_promoted', user_id=user.id, actor_id=current_user.id)
+    db.session.commit()
+    flash('Đã thêm người dùng', 'success')
+    return redirect(url_for('admin.manage_users'))
+# SỬA USER
+@admin_bp.route('/edit_user/<int:id>')
+@login_required
+@admin_required
+def edit_user_page(id):
+    return render_template('edit_user.html', user=User.query.get_or_404(id))
+@admin_bp.route('/update_user/<int:id>', methods=['POST'])
+@login_required
+@admin_required
+def update_user(id):
+    user = User.query.get_or_404(id)
+    user.fullname = request.form['fullname']
+    user.position = request.form['position']
+    is_admin = 'is_admin' in request.form
+    record('user_updated', user_id=id, actor_id=current_user.id)
+    if is_admin != user.is_admin:
+        record('user_promoted' if is_admin else 'user_demoted', user_id=id, actor_id=current_user.id)
+    user.is_admin = is_admin
+    db.session.commit()
+    flash('Cập nhật thành công', 'success')
+    return redirect(url_for('admin.manage_users'))
+# CHẶN USER
+@admin_bp.route('/toggle_user/<int:id>')
+@login_required
+@admin_required
+def toggle_user(id):
+    user = User.query.get_or_404(id)
+
+    if user.id == current_user.id:
+        flash('Không thể tự khóa chính mình', 'warning')
+        return redirect(url_for('admin.manage_users'))
+
+    user.is_active = not user.is_active
+    record('user_unblocked' if user.is_active else 'user_blocked', user_id=id, actor_id=current_user.id)
+    db.session.commit()
+
+    if user.is_active:
+        flash('Đã mở khóa tài khoản', 'success')
+    else:
+        flash('Đã chặn tài khoản', 'danger')
+
+    return redirect(url_for('admin.manage_users'))
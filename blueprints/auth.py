@@ -0,0 +1,141 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+from extensions import db
+from models import User, BorrowLog
+from ratelimit import rate_limit
+from utils import save_picture
+
+auth_bp = Blueprint('auth', __name__)
+
+# --- NHÓM: AUTH & USER ---
+@auth_bp.route('/register', methods=['GET', 'POST'])
+@rate_limit('RATELIMIT_LOGIN', by='ip', methods=('POST',))
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('books.index'))
+    
+    from forms import RegistrationForm # import trễ: wtforms chỉ nạp khi cần
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        try:
+            # Tất cả user mới đều là user bình thường
+            user = User(
+                username=form.username.data,
+                fullname=form.fullname.data,
+                user_code=form.user_code.data,
+                birth_date=form.birth_date.data,
+                position=form.position.data,
+                is_admin=False  # Không phải admin
+            )
+            user.set_password(form.password.data)
+            db.session.add(user)
+            db.session.commit()
+            
+            flash('Đăng ký thành công! Mời bạn đăng nhập.', 'success')
+            return redirect(url_for('auth.login'))
+        
+        except Exception as e:
+            db.session.rollback()
+            print(f"Lỗi đăng ký: {e}")
+            flash(f'Có lỗi xảy ra khi đăng ký. Mã lỗi: {e}', 'danger')
+    
+    if request.method == 'POST' and not form.validate():
+        print("Lỗi Validate Form:", form.errors)
+        
+    return render_template('register.html', form=form)
+
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+@rate_limit('RATELIMIT_LOGIN', by='ip', methods=('POST',))
+def login():
+    if current_user.is_authenticated: return redirect(url_for('books.index'))
+    from forms import LoginForm
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if user and user.check_password(form.password.data):
+            if not user.is_active:
+                flash('Tài khoản đã bị chặn. Vui lòng liên hệ quản trị viên.', 'danger')
+                return redirect(url_for('auth.login'))
+
+            login_user(user)
+            return redirect(request.args.get('next') or url_for('books.index'))
+        else: flash('Sai tên đăng nhập hoặc mật khẩu.', 'danger')
+    return render_template('login.html', form=form)
+
+@auth_bp.route('/logout')
+@login_required
+def logout():
+    logout_user(); return redirect(url_for('auth.login'))
+
+@auth_bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+def profile():
+    from forms import UpdateProfileForm, ChangePasswordForm
+    profile_form = UpdateProfileForm()
+    password_form = ChangePasswordForm()
+
+    # ===== CẬP NHẬT HỒ SƠ =====
+    if profile_form.submit_profile.data and profile_form.validate():
+        if profile_form.avatar.data:
+            current_user.avatar = save_picture(
+                profile_form.avatar.data,
+                current_app.config['UPLOAD_FOLDER_AVATARS']
+            )
+
+        current_user.fullname = profile_form.fullname.data
+        current_user.username = profile_form.username.data
+        current_user.birth_date = profile_form.birth_date.data
+        current_user.position = profile_form.position.data
+
+        db.session.commit()
+        flash('Cập nhật hồ sơ thành công!', 'success')
+        return redirect(url_for('auth.profile'))
+
+    # ===== ĐỔI MẬT KHẨU =====
+    if password_form.submit_password.data and password_form.validate():
+        if not current_user.check_password(password_form.old_password.data):
+            flash('Mật khẩu cũ không đúng.', 'danger')
+        else:
+            current_user.set_password(password_form.new_password.data)
+            db.session.commit()
+            flash('Đổi mật khẩu thành công!', 'success')
+            return redirect(url_for('auth.profile'))
+
+    # ===== LOAD FORM =====
+    if request.method == 'GET':
+        profile_form.fullname.data = current_user.fullname
+        profile_form.username.data = current_user.username
+        profile_form.birth_date.data = current_user.birth_date
+        profile_form.position.data = current_user.position
+
+    # ===== AVATAR =====
+    image_file = url_for(
+        'static',
+        filename='avatars/' + current_user.avatar
+    )
+
+    # ===== USER: lịch sử mượn =====
+    my_logs = BorrowLog.query.filter_by(
+        user_id=current_user.id
+    ).order_by(
+        BorrowLog.borrow_date.desc()
+    ).all()
+
+    # ===== ADMIN: danh sách người đang mượn =====
+    all_borrowing_logs = None
+    if current_user.is_admin:
+        all_borrowing_logs = BorrowLog.query.filter_by(
+            return_date=None
+        ).order_by(
+            BorrowLog.borrow_date.desc()
+        ).all()
+
+    return render_template(
+        'profile.html',
+        profile_form=profile_form,
+        password_form=password_form,
+        image_file=image_file,
+        my_logs=my_logs,
+        all_borrowing_logs=all_borrowing_logs
+    )
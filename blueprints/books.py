@@ -0,0 +1,210 @@
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from extensions import db
+from events import record
+from ratelimit import rate_limit
+from routing import read_only
+from models import Author, Book, BorrowLog, Category, Language, Rating, Wishlist
+
+books_bp = Blueprint('books', __name__)
+
+SEARCH_PER_PAGE = 10
+
+def search_filters(args):
+    """Điều kiện lọc sách theo tham số q_title/q_author/q_category/q_language"""
+    filters = []
+    if args.get('q_title'):
+        filters.append(Book.title.like(f"%{args['q_title']}%"))
+    if args.get('q_author'):
+        filters.append(Author.name.like(f"%{args['q_author']}%"))
+    if args.get('q_category'):
+        filters.append(Category.id == args['q_category'])
+    if args.get('q_language'):
+        filters.append(Language.id == args['q_language'])
+    return filters
+
+def search_statement(args):
+    """Câu SELECT cho API tìm kiếm, dùng chung cho route Flask và route async trong asgi.py"""
+    try:
+        page = max(int(args.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    return (
+        db.select(Book.id, Book.title, Author.name.label('author'), Category.name.label('category'),
+                  Language.name.label('language'), Book.available_quantity, Book.total_quantity)
+        .join(Author).join(Category).join(Language)
+        .where(*search_filters(args))
+        .order_by(Book.title)
+        .limit(SEARCH_PER_PAGE).offset((page - 1) * SEARCH_PER_PAGE)
+    ), page
+
+@books_bp.route('/')
+@login_required
+@read_only
+def index():
+    q_title = request.args.get('q_title')
+    q_author = request.args.get('q_author')
+    q_category = request.args.get('q_category')
+    q_language = request.args.get('q_language')
+
+    page = request.args.get('page', 1, type=int)
+    per_page = SEARCH_PER_PAGE
+
+    query = Book.query.join(Author).join(Category).join(Language).filter(*search_filters(request.args))
+
+    pagination = query.order_by(Book.title).paginate(
+        page=page,
+        per_page=per_page,
+        error_out=False
+    )
+
+    books = pagination.items
+    categories = Category.query.all()
+    languages = Language.query.all()
+
+    wishlist_book_ids = [item.book_id for item in current_user.wishlist]
+
+    return render_template(
+        'index.html',
+        books=books,
+        pagination=pagination,   
+        categories=categories,
+        languages=languages,
+        q_title=q_title,
+        q_author=q_author,
+        q_category=q_category,
+        q_language=q_language,
+        wishlist_book_ids=wishlist_book_ids
+    )
+
+# API tìm kiếm (JSON); khi chạy qua asgi.py route này được phục vụ async, không qua Flask
+@books_bp.route('/api/books')
+@login_required
+@read_only
+def search_api():
+    statement, page = search_statement(request.args)
+    books = [dict(row._mapping) for row in db.session.execute(statement)]
+    return jsonify(page=page, books=books)
+
+@books_bp.route('/book/<int:id>', methods=['GET', 'POST']) # thay thế đoạn cũ(thêm tính năng mới)
+@login_required
+@read_only
+@rate_limit('RATELIMIT_WRITE', methods=('POST',))
+def view_book(id):
+    book = Book.query.get_or_404(id)
+    from forms import RatingForm # import trễ: wtforms chỉ nạp khi cần
+    form = RatingForm()
+    
+    # Kiểm tra xem user đã đánh giá sách này chưa
+    existing_rating = Rating.query.filter_by(user_id=current_user.id, book_id=book.id).first()
+    
+    if form.validate_on_submit():
+        if existing_rating:
+            flash('Bạn đã đánh giá sách này rồi.', 'warning')
+        else:
+            new_rating = Rating(
+                user_id=current_user.id,
+                book_id=book.id,
+                score=form.score.data,
+                comment=form.comment.data
+            )
+            db.session.add(new_rating)
+            db.session.commit()
+            flash('Cảm ơn bạn đã đánh giá sách này!', 'success')
+            return redirect(url_for('books.view_book', id=book.id))
+    
+    # Lấy tất cả đánh giá của sách này
+    ratings = Rating.query.filter_by(book_id=book.id).order_by(Rating.created_at.desc()).all()
+    
+    return render_template('view_book.html', book=book, form=form, ratings=ratings, existing_rating=existing_rating) 
+
+@books_bp.route('/borrow_book/<int:book_id>')
+@login_required
+@rate_limit('RATELIMIT_WRITE')
+def borrow_book(book_id):
+    book = Book.query.get_or_404(book_id)
+    if book.available_quantity <= 0:
+        flash('Sách này đã hết, vui lòng quay lại sau.', 'danger')
+        return redirect(url_for('books.view_book', id=book_id))
+    existing_log = BorrowLog.query.filter_by(user_id=current_user.id, book_id=book.id, return_date=None).first()
+    if existing_log:
+        flash('Bạn đang mượn cuốn sách này rồi. Vui lòng trả trước khi mượn thêm.', 'warning')
+        return redirect(url_for('books.view_book', id=book_id))
+    try:
+        new_log = BorrowLog(user_id=current_user.id, book_id=book.id)
+        db.session.add(new_log)
+        book.available_quantity = book.available_quantity - 1
+        record('borrowed', user_id=current_user.id, book_id=book_id)
+        db.session.commit()
+        flash('Bạn đã đăng ký mượn sách thành công!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi khi mượn sách: {e}', 'danger')
+    return redirect(url_for('books.view_book', id=book_id))
+
+#! <<< ĐÂY LÀ HÀM CẦN SỬA >>>
+@books_bp.route('/return_book/<int:log_id>')
+@login_required
+@rate_limit('RATELIMIT_WRITE')
+#@admin_required #! <<< 1. BỎ DÒNG NÀY ĐI >>>
+def return_book(log_id):
+    log = BorrowLog.query.get_or_404(log_id)
+    
+    #! <<< 2. THÊM ĐOẠN KIỂM TRA QUYỀN NÀY VÀO >>>
+    if not current_user.is_admin and current_user.id != log.user_id:
+        flash('Bạn không có quyền thực hiện hành động này.', 'danger')
+        return redirect(url_for('books.index'))
+    
+    if log and log.return_date is None:
+        try:
+            log.return_date = datetime.utcnow()
+            book = Book.query.get(log.book_id)
+            if book:
+                book.available_quantity = book.available_quantity + 1
+            record('returned', user_id=log.user_id, book_id=log.book_id, actor_id=current_user.id)
+            db.session.commit()
+            flash('Đã trả sách thành công.', 'success')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Lỗi khi trả sách: {e}', 'danger')
+    else:
+        flash('Lịch sử mượn này đã được xử lý hoặc không hợp lệ.', 'warning')
+    
+    #! <<< 3. THÊM LOGIC CHUYỂN HƯỚNG NÀY >>>
+    if current_user.is_admin:
+        return redirect(url_for('admin.borrow_history')) # Admin về trang quản lý
+    else:
+        return redirect(url_for('auth.profile')) # User về trang cá nhân
+
+# --- NHÓM: WISHLIST --- ( Thêm mới Tấn Lộc)
+
+@books_bp.route('/wishlist')
+@login_required
+@read_only
+def my_wishlist():
+    # Lấy danh sách yêu thích của user hiện tại, sắp xếp theo ngày thêm mới nhất
+    items = Wishlist.query.filter_by(user_id=current_user.id).order_by(Wishlist.date_added.desc()).all()
+    return render_template('wishlist.html', items=items)
+
+@books_bp.route('/toggle_wishlist/<int:book_id>')
+@login_required
+@rate_limit('RATELIMIT_WRITE')
+def toggle_wishlist(book_id):
+    # Kiểm tra xem đã thích chưa
+    existing_item = Wishlist.query.filter_by(user_id=current_user.id, book_id=book_id).first()
+    
+    if existing_item:
+        # Nếu có rồi thì xóa (Bỏ thích)
+        db.session.delete(existing_item)
+        db.session.commit()
+        flash('Đã xóa khỏi danh sách yêu thích.', 'info')
+    else:
+        # Nếu chưa có thì thêm mới
+        new_item = Wishlist(user_id=current_user.id, book_id=book_id)
+        db.session.add(new_item)
+        db.session.commit()
+        flash('Đã thêm vào danh sách yêu thích!', 'success')
+        
+    # Quay lại trang người dùng vừa đứng
+    return redirect(request.referrer or url_for('books.index'))
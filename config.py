@@ -0,0 +1,67 @@
+import os
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# ==============================================================================
+# CẤU HÌNH THEO MÔI TRƯỜNG
+# Chọn bằng biến môi trường LIBRARY_CONFIG=development|testing|production,
+# các giá trị nhạy cảm (SECRET_KEY, DATABASE_URL) đọc từ môi trường.
+# ==============================================================================
+class Config:
+    # Không có giá trị mặc định: production bắt buộc đặt biến môi trường SECRET_KEY
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'library.db'))
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # DB chính qua driver async cho route async của asgi.py; mặc định suy ra từ DATABASE_URL
+    SQLALCHEMY_ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    # Replica chỉ đọc, ví dụ DATABASE_REPLICA_URLS=sqlite:///replica1.db,sqlite:///replica2.db
+    SQLALCHEMY_REPLICA_URIS = [u for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u]
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))          # giây
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', 2))
+    REPLICA_PIN_SECONDS = float(os.environ.get('REPLICA_PIN_SECONDS', 10))  # đọc từ DB chính sau khi ghi
+    # Thư mục chứa file lưu trữ nhật ký sự kiện mượn/trả (archive_events.py)
+    EVENT_ARCHIVE_FOLDER = os.environ.get('EVENT_ARCHIVE_FOLDER', os.path.join(basedir, 'event_archive'))
+    # Số reverse proxy (nginx...) đứng trước app; >0 thì lấy IP/scheme thật từ X-Forwarded-For/-Proto.
+    # Phải đặt khi chạy sau proxy, nếu không mọi client chung một IP (của proxy) khi giới hạn tần suất.
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+    # Giới hạn tần suất: 'số lần/second|minute|hour|day' cho mỗi route và mỗi user/IP
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') != '0'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_LOGIN = os.environ.get('RATELIMIT_LOGIN', '10/minute')  # đăng nhập/đăng ký, theo IP
+    RATELIMIT_WRITE = os.environ.get('RATELIMIT_WRITE', '30/minute')  # mượn/trả, yêu thích, đánh giá, theo user
+    # Template trỏ tới file tải lên bằng url_for('static', ...) nên các thư mục này phải nằm trong static/
+    UPLOAD_FOLDER_AVATARS = os.path.join(basedir, 'static', 'avatars')
+    UPLOAD_FOLDER_BOOKS = os.path.join(basedir, 'static', 'book_covers')
+    UPLOAD_FOLDER_FILES = os.path.join(basedir, 'static', 'book_files')
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'khoa-bi-mat-sieu-cap-vipro-123456')
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'khoa-bi-mat-cho-test')
+    # Mỗi instance test dùng DB riêng trong bộ nhớ -> chạy song song không đụng library.db
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    WTF_CSRF_ENABLED = False
+    RATELIMIT_ENABLED = False  # test riêng cho ratelimit tự bật lại
+
+class ProductionConfig(Config):
+    DEBUG = False
+    # Nhiều worker/thread cùng ghi SQLite: chờ khóa ghi thay vì báo "database is locked" ngay
+    SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 15}} if Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {}
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+def get_config(name=None):
+    """Trả về lớp cấu hình theo tên, mặc định lấy từ LIBRARY_CONFIG"""
+    name = name or os.environ.get('LIBRARY_CONFIG', 'development')
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f'Cấu hình không hợp lệ: {name!r} (chọn một trong {", ".join(config_by_name)})')
@@ -0,0 +1,88 @@
+import glob
+import gzip
+import os
+import struct
+from datetime import datetime, timedelta
+from extensions import db
+from models import CirculationEvent
+
+# ==============================================================================
+# NHẬT KÝ SỰ KIỆN MƯỢN/TRẢ (APPEND-ONLY)
+# View gọi record() TRƯỚC db.session.commit(): sự kiện được ghi trong cùng
+# transaction với thay đổi, nên chỉ tồn tại khi thay đổi được commit. Với SQLite
+# các transaction ghi chạy tuần tự, nên thứ tự id cũng là thứ tự commit; replay dựa
+# vào đó để áp dụng lẫn lộn giá trị tuyệt đối (stock_changed) và tăng/giảm (mượn/trả).
+# ==============================================================================
+EVENT_KINDS = (
+    'borrowed',        # user_id mượn book_id (available -1)
+    'returned',        # user_id trả book_id (available +1)
+    'stock_changed',   # số lượng tuyệt đối của book_id sau khi thêm/sửa sách
+    'book_updated',    # admin sửa thông tin sách
+    'book_deleted',
+    'user_updated',    # admin sửa thông tin user
+    'user_blocked',
+    'user_unblocked',
+    'user_promoted',   # user_id được cấp quyền admin (thêm mới: mã loại trong file lưu trữ giữ nguyên)
+    'user_demoted',    # user_id bị thu hồi quyền admin
+)
+FIELDS = ('user_id', 'book_id', 'actor_id', 'available_quantity', 'total_quantity')
+
+def record(kind, **fields):
+    """Thêm một sự kiện vào transaction hiện tại của db.session (gọi trước commit)"""
+    if kind not in EVENT_KINDS:
+        raise ValueError(f'Loại sự kiện không hợp lệ: {kind!r}')
+    db.session.add(CirculationEvent(kind=kind, created_at=datetime.utcnow(), **fields))
+
+# ==============================================================================
+# ĐỊNH DẠNG LƯU TRỮ (.bin.gz)
+# Header b'LEV1', sau đó mỗi sự kiện là một bản ghi nhị phân cố định 33 byte:
+# id, thời điểm (micro giây epoch), mã loại, user_id, book_id, actor_id (0 = trống),
+# available_quantity, total_quantity (-1 = trống); toàn bộ nén gzip.
+# ==============================================================================
+ARCHIVE_MAGIC = b'LEV1'
+RECORD = struct.Struct('<IqBIIIii')
+EPOCH = datetime(1970, 1, 1)
+
+def _encode(event):
+    micros = (event['created_at'] - EPOCH) // timedelta(microseconds=1)
+    return RECORD.pack(
+        event['id'], micros, EVENT_KINDS.index(event['kind']),
+        event['user_id'] or 0, event['book_id'] or 0, event['actor_id'] or 0,
+        -1 if event['available_quantity'] is None else event['available_quantity'],
+        -1 if event['total_quantity'] is None else event['total_quantity'],
+    )
+
+def _decode(chunk):
+    event_id, micros, kind, user_id, book_id, actor_id, available, total = RECORD.unpack(chunk)
+    return {
+        'id': event_id,
+        'created_at': EPOCH + timedelta(microseconds=micros),
+        'kind': EVENT_KINDS[kind],
+        'user_id': user_id or None,
+        'book_id': book_id or None,
+        'actor_id': actor_id or None,
+        'available_quantity': None if available == -1 else available,
+        'total_quantity': None if total == -1 else total,
+    }
+
+def write_archive(path, events):
+    with gzip.open(path, 'wb') as f:
+        f.write(ARCHIVE_MAGIC)
+        for event in events:
+            f.write(_encode(event))
+
+def archive_files(folder):
+    """Các file lưu trữ theo thứ tự id (tên file events-<id đầu>-<id cuối>.bin.gz)"""
+    return sorted(glob.glob(os.path.join(folder, 'events-*.bin.gz')))
+
+def last_archived_id(folder):
+    """Id lớn nhất đã nằm trong file lưu trữ, 0 nếu chưa có file nào"""
+    files = archive_files(folder)
+    return int(os.path.basename(files[-1]).split('.')[0].split('-')[2]) if files else 0
+
+def read_archive(path):
+    with gzip.open(path, 'rb') as f:
+        if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+            raise ValueError(f'{path} không phải file lưu trữ sự kiện')
+        while chunk := f.read(RECORD.size):
+            yield _decode(chunk)
@@ -0,0 +1,10 @@
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+from routing import RoutingSession
+
+# Các extension được tạo ở đây (chưa gắn app), create_app() sẽ gọi init_app()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+login_manager.login_message = 'Vui lòng đăng nhập để sử dụng tính năng này.'
+login_manager.login_message_category = 'info'
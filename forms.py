@@ -0,0 +1,48 @@
+from flask_login import current_user
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed
+from wtforms import StringField, PasswordField, SubmitField, DateField
+from wtforms.validators import DataRequired, Length, EqualTo, ValidationError
+from models import User
+
+class RegistrationForm(FlaskForm):
+    user_code = StringField('Mã số', validators=[DataRequired(), Length(min=3, max=20)])
+    fullname = StringField('Họ tên', validators=[DataRequired(), Length(min=2, max=100)])
+    username = StringField('Username', validators=[DataRequired(), Length(min=4, max=80)])
+    birth_date = DateField('Ngày sinh', format='%Y-%m-%d', validators=[DataRequired()])
+    position = StringField('Chức vụ', validators=[DataRequired()])
+    password = PasswordField('Mật khẩu', validators=[DataRequired(), Length(min=6)])
+    confirm_password = PasswordField('Nhập lại MK', validators=[DataRequired(), EqualTo('password')])
+    submit = SubmitField('Đăng ký')
+    def validate_username(self, username):
+        if User.query.filter_by(username=username.data).first(): raise ValidationError('Tên đăng nhập đã tồn tại.')
+    def validate_user_code(self, user_code):
+        if User.query.filter_by(user_code=user_code.data).first(): raise ValidationError('Mã số này đã được sử dụng.')
+class LoginForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Đăng nhập')
+class UpdateProfileForm(FlaskForm):
+    fullname = StringField('Họ tên', validators=[DataRequired(), Length(min=2)])
+    username = StringField('Username', validators=[DataRequired(), Length(min=4)])
+    birth_date = DateField('Ngày sinh', format='%Y-%m-%d', validators=[DataRequired()])
+    position = StringField('Chức vụ', validators=[DataRequired()])
+    avatar = FileField('Avatar', validators=[FileAllowed(['jpg', 'png', 'jpeg'], 'Chỉ nhận file ảnh!')])
+    submit_profile = SubmitField('Cập nhật')
+    def validate_username(self, username):
+        if username.data != current_user.username:
+            if User.query.filter_by(username=username.data).first(): raise ValidationError('Tên đăng nhập này đã có người sử dụng.')
+class ChangePasswordForm(FlaskForm):
+    old_password = PasswordField('Nhập mật khẩu cũ', validators=[DataRequired()])
+    new_password = PasswordField('Nhập mật khẩu mới', validators=[DataRequired(), Length(min=6)])
+    confirm_password = PasswordField('Xác nhận lại mật khẩu mới', validators=[DataRequired(), EqualTo('new_password')])
+    submit_password = SubmitField('Đổi mật khẩu')
+
+# ==== Thêm form đánh giá sách ====
+from wtforms import IntegerField, TextAreaField # (thêm tính năng mới)
+from wtforms.validators import NumberRange, Optional # (thêm mới)
+
+class RatingForm(FlaskForm): # (thêm mới)
+    score = IntegerField('Điểm đánh giá chất lượng sách (1⭐ - 5⭐). ', validators=[DataRequired(), NumberRange(min=1, max=5)]) # (thêm mới)
+    comment = TextAreaField('Hãy chia sẻ nhận xét cho sách này bạn nhé!', validators=[Optional(), Length(max=500)]) # (thêm mới)
+    submit_rating = SubmitField('Gửi đánh giá') # (thêm mới)
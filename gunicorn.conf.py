@@ -0,0 +1,24 @@
+import multiprocessing
+import os
+
+# Cấu hình gunicorn cho wsgi:app, mọi giá trị đều ghi đè được bằng biến môi trường
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# gthread: mỗi worker có nhiều thread, hợp với các route chủ yếu chờ I/O (DB, file sách)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Khởi động lại worker định kỳ để tránh rò rỉ bộ nhớ tích lũy
+max_requests = 1000
+max_requests_jitter = 100
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None  # chuỗi rỗng: tắt access log
+
+def on_starting(server):
+    # Bước migrate: tạo các bảng còn thiếu một lần ở tiến trình master, trước khi fork worker
+    from app import create_app, init_db
+    from extensions import db
+    app = create_app(os.environ.get('LIBRARY_CONFIG', 'production'))
+    with app.app_context():
+        init_db()
+        db.engine.dispose()
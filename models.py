@@ -0,0 +1,99 @@
+from datetime import datetime
+from flask_login import UserMixin
+from werkzeug.security import generate_password_hash, check_password_hash
+from extensions import db, login_manager
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+class User(db.Model, UserMixin):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    fullname = db.Column(db.String(100), nullable=True)
+    user_code = db.Column(db.String(20), unique=True, nullable=False)
+    birth_date = db.Column(db.Date, nullable=True)
+    position = db.Column(db.String(100), nullable=True)
+    password_hash = db.Column(db.String(128), nullable=False)
+    is_admin = db.Column(db.Boolean, nullable=False, default=False)
+    is_active = db.Column(db.Boolean, default=True) 
+    avatar = db.Column(db.String(100), nullable=False, default='default.jpg')
+    # >>> THÊM DÒNG NÀY <<< ( Thêm Mới Tấn Lộc)
+    wishlist = db.relationship('Wishlist', backref='user', lazy=True) 
+    borrow_logs = db.relationship('BorrowLog', backref='borrower', lazy=True)
+    def set_password(self, password): self.password_hash = generate_password_hash(password)
+    def check_password(self, password): return check_password_hash(self.password_hash, password)
+
+class Author(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    books = db.relationship('Book', backref='author', lazy=True)
+
+class Category(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    books = db.relationship('Book', backref='category', lazy=True)
+
+class Language(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    books = db.relationship('Book', backref='language', lazy=True)
+
+class Book(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    year = db.Column(db.Integer, nullable=True)
+    price = db.Column(db.Integer, nullable=True)
+    summary = db.Column(db.Text, nullable=True)
+    author_id = db.Column(db.Integer, db.ForeignKey('author.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    language_id = db.Column(db.Integer, db.ForeignKey('language.id'), nullable=False)
+    image_file = db.Column(db.String(100), nullable=False, default='default_book.jpg')
+    book_file = db.Column(db.String(200), nullable=True) # Dùng để khai báo một cột trong bảng CSDL, dùng để lưu đường dẫn hoặc tên file sách(tính năng mới)
+    total_quantity = db.Column(db.Integer, nullable=False, default=1)
+    available_quantity = db.Column(db.Integer, nullable=False, default=1)
+    borrow_logs = db.relationship('BorrowLog', backref='book', lazy=True)
+    @property
+    def is_available(self):
+        return self.available_quantity > 0
+
+class BorrowLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
+    borrow_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    return_date = db.Column(db.DateTime, nullable=True)
+
+# --- Thêm vào file app.py (Dưới class BorrowLog) --- ( Thêm mới Tấn Lộc)
+class Wishlist(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
+    date_added = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Quan hệ để lấy thông tin sách dễ dàng
+    book = db.relationship('Book', lazy=True)
+
+class Rating(db.Model): # (thêm tính năng mới)
+    id = db.Column(db.Integer, primary_key=True) # (thêm mới)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False) # (thêm mới)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False) # (thêm mới)
+    score = db.Column(db.Integer, nullable=False)  # 1 đến 5 sao # (thêm mới)
+    comment = db.Column(db.Text, nullable=True) # (thêm mới)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow) # (thêm mới)
+    
+    user = db.relationship('User', backref='ratings') # (thêm mới)
+    book = db.relationship('Book', backref='ratings') # (thêm mới
+
+class CirculationEvent(db.Model):
+    # Nhật ký sự kiện chỉ ghi thêm (không sửa/xóa), ghi cùng transaction với thay đổi bởi events.record()
+    # AUTOINCREMENT: id không bao giờ bị dùng lại sau khi archive_events.py xóa hết các dòng cũ
+    __table_args__ = {'sqlite_autoincrement': True}
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, nullable=True)   # không dùng ForeignKey: sự kiện phải còn sau khi xóa sách/user
+    book_id = db.Column(db.Integer, nullable=True, index=True)
+    actor_id = db.Column(db.Integer, nullable=True)  # người thực hiện (admin) nếu khác user_id
+    available_quantity = db.Column(db.Integer, nullable=True)  # giá trị tuyệt đối sau thay đổi (stock_changed)
+    total_quantity = db.Column(db.Integer, nullable=True)
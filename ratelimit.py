@@ -0,0 +1,121 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+from flask_login import current_user
+from werkzeug.exceptions import TooManyRequests
+
+# ==============================================================================
+# GIỚI HẠN TẦN SUẤT REQUEST (TOKEN BUCKET)
+# Mỗi route + mỗi user/IP có một "xô" chứa tối đa N token, nạp lại đều N token
+# trong một chu kỳ; mỗi request lấy 1 token, hết token thì trả 429 + Retry-After.
+# Backend: bộ nhớ trong tiến trình (mặc định, mỗi worker gunicorn đếm riêng) hoặc
+# Redis dùng chung giữa các worker (RATELIMIT_STORAGE_URL=redis://localhost:6379/0).
+# ==============================================================================
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+NON_LIMIT_KEYS = ('RATELIMIT_ENABLED', 'RATELIMIT_STORAGE_URL')
+
+def parse_limit(limit):
+    """'10/minute' -> (sức chứa 10, tốc độ nạp token/giây)"""
+    count, _, period = str(limit).partition('/')
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period.strip()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Giới hạn không hợp lệ: {limit!r} (dạng 'số lần/{'|'.join(PERIODS)}')") from None
+    if capacity < 1:
+        raise ValueError(f'Giới hạn không hợp lệ: {limit!r} (số lần phải >= 1)')
+    return capacity, capacity / seconds
+
+class MemoryBackend:
+    def __init__(self, max_keys=10000):
+        # key -> (số token, thời điểm cập nhật); thứ tự LRU: cũ nhất ở đầu
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def consume(self, key, capacity, rate):
+        """Lấy 1 token, trả về (được phép?, số giây cần chờ)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            # Quá giới hạn thì bỏ xô ít dùng gần đây nhất, chi phí O(1) mỗi request
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+class RedisBackend:
+    # Đọc - tính - ghi trong một script Lua để nguyên tử giữa nhiều worker
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        import redis  # chỉ cần cài redis khi dùng backend này
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self._script(keys=[f'ratelimit:{key}'], args=[capacity, rate, time.time()])
+        tokens = float(tokens)
+        return bool(allowed), 0 if allowed else (1 - tokens) / rate
+
+def init_ratelimit(app):
+    url = app.config['RATELIMIT_STORAGE_URL']
+    if url.startswith('memory://'):
+        backend = MemoryBackend()
+    elif url.startswith(('redis://', 'rediss://', 'unix://')):
+        backend = RedisBackend(url)
+    else:
+        raise ValueError(f'RATELIMIT_STORAGE_URL không được hỗ trợ: {url!r}')
+    app.extensions['ratelimit'] = backend
+    # Kiểm tra mọi giới hạn RATELIMIT_* ngay khi tạo app, không để lỗi cấu hình thành lỗi 500 lúc chạy
+    limits = {}
+    for key, value in app.config.items():
+        if key.startswith('RATELIMIT_') and key not in NON_LIMIT_KEYS:
+            try:
+                limits[key] = parse_limit(value)
+            except ValueError as e:
+                raise ValueError(f'{key}: {e}') from None
+    app.extensions['ratelimit_limits'] = limits
+
+def rate_limit(config_key, by='user', methods=None):
+    """Giới hạn tần suất gọi view theo giới hạn lưu ở app.config[config_key].
+
+    by='user': theo user đang đăng nhập (đặt sau @login_required), by='ip': theo địa chỉ IP.
+    methods: chỉ áp dụng cho các method này, vd ('POST',); mặc định mọi method.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if current_app.config['RATELIMIT_ENABLED'] and (methods is None or request.method in methods):
+                capacity, rate = current_app.extensions['ratelimit_limits'][config_key]
+                who = f'u{current_user.id}' if by == 'user' and current_user.is_authenticated else request.remote_addr
+                allowed, retry_after = current_app.extensions['ratelimit'].consume(f'{request.endpoint}:{who}', capacity, rate)
+                if not allowed:
+                    raise TooManyRequests(retry_after=math.ceil(retry_after))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
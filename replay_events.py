@@ -0,0 +1,103 @@
+import argparse
+import sys
+from collections import Counter
+from app import create_app, init_db
+from extensions import db
+from events import FIELDS, archive_files, read_archive, record
+from models import Book, CirculationEvent, User
+
+# Dựng lại số lượng sách và thống kê từ nhật ký sự kiện (file lưu trữ + bảng
+# circulation_event), sau đó đối chiếu với bảng Book/User đang chạy:
+#   python replay_events.py --snapshot   # chạy 1 lần khi bật nhật ký: ghi mốc số lượng hiện tại
+#   python replay_events.py              # replay và kiểm tra
+def iter_events(app):
+    last_id = 0
+    for path in archive_files(app.config['EVENT_ARCHIVE_FOLDER']):
+        for e in read_archive(path):
+            last_id = e['id']
+            yield e
+    # Dòng đã có trong file lưu trữ (archive bị dừng trước khi xóa khỏi bảng) không replay lại
+    query = CirculationEvent.query.filter(CirculationEvent.id > last_id).order_by(CirculationEvent.id)
+    for e in query.yield_per(1000):
+        yield {c: getattr(e, c) for c in ('id', 'kind', 'created_at') + FIELDS}
+
+def replay(events):
+    stock = {}              # book_id -> [available, total]
+    blocked = {}            # user_id -> True/False
+    borrows = Counter()     # book_id -> số lượt mượn
+    borrowers = Counter()   # user_id -> số lượt mượn
+    kinds = Counter()
+    for e in events:
+        kind, book_id = e['kind'], e['book_id']
+        kinds[kind] += 1
+        if kind == 'stock_changed':
+            stock[book_id] = [e['available_quantity'], e['total_quantity']]
+        elif kind == 'borrowed':
+            borrows[book_id] += 1
+            borrowers[e['user_id']] += 1
+            if book_id in stock: stock[book_id][0] -= 1
+        elif kind == 'returned':
+            if book_id in stock: stock[book_id][0] += 1
+        elif kind == 'book_deleted':
+            stock.pop(book_id, None)
+        elif kind in ('user_blocked', 'user_unblocked'):
+            blocked[e['user_id']] = kind == 'user_blocked'
+    return stock, blocked, borrows, borrowers, kinds
+
+def snapshot():
+    """Ghi sự kiện mốc với số lượng hiện tại của mọi sách và các user đang bị chặn"""
+    for book in Book.query.all():
+        record('stock_changed', book_id=book.id, available_quantity=book.available_quantity, total_quantity=book.total_quantity)
+    for user in User.query.filter_by(is_active=False).all():
+        record('user_blocked', user_id=user.id)
+    db.session.commit()
+
+def verify(stock, blocked):
+    """Đối chiếu kết quả replay với bảng Book/User, trả về (số sách khớp, sách chưa có mốc, danh sách lệch)"""
+    books = {b.id: b for b in Book.query.all()}
+    mismatches, uncovered, matched = [], [], 0
+    for book in books.values():
+        actual = [book.available_quantity, book.total_quantity]
+        if book.id not in stock:
+            uncovered.append(book.id)
+        elif stock[book.id] != actual:
+            mismatches.append(f"  Sách #{book.id} '{book.title}': replay={stock[book.id]} thực tế={actual}")
+        else:
+            matched += 1
+    mismatches += [f"  Sách #{book_id} đã xóa nhưng replay vẫn còn" for book_id in stock if book_id not in books]
+    for user_id, is_blocked in blocked.items():
+        user = User.query.get(user_id)
+        if user and user.is_active == is_blocked:
+            mismatches.append(f"  User #{user_id}: replay bị chặn={is_blocked}, thực tế is_active={user.is_active}")
+    return matched, uncovered, mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay nhật ký sự kiện mượn/trả')
+    parser.add_argument('--snapshot', action='store_true', help='ghi sự kiện mốc cho toàn bộ sách và user bị chặn')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+        if args.snapshot:
+            snapshot()
+            print(">>> Đã ghi sự kiện mốc.")
+
+        stock, blocked, borrows, borrowers, kinds = replay(iter_events(app))
+        print("Số sự kiện:", ", ".join(f"{k}={n}" for k, n in sorted(kinds.items())) or "0")
+        matched, uncovered, mismatches = verify(stock, blocked)
+        books = {b.id: b.title for b in Book.query.all()}
+
+        print(f"Khớp {matched}/{len(books)} sách; {len(uncovered)} sách chưa có sự kiện mốc (chạy --snapshot).")
+        print("Top sách được mượn nhiều nhất:")
+        for book_id, n in borrows.most_common(10):
+            print(f"  {n:>5}  #{book_id} {books.get(book_id, '(đã xóa)')}")
+        print(f"Số người đã mượn: {len(borrowers)}")
+        if mismatches:
+            print("KHÔNG KHỚP:")
+            print("\n".join(mismatches))
+            sys.exit(1)
+        print("Replay khớp với dữ liệu hiện tại.")
+
+if __name__ == '__main__':
+    main()
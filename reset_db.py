@@ -1,17 +1,18 @@
-from app import app, db
-import os
+from app import create_app, create_sample_data
+from extensions import db
 
-# 1. Xóa file cũ nếu có
-db_path = "library.db"
-if os.path.exists(db_path):
-    os.remove(db_path)
-    print("Đã xóa database cũ.")
+# Làm việc trên DB theo cấu hình hiện tại (LIBRARY_CONFIG / DATABASE_URL),
+# không xóa file library.db theo đường dẫn tương đối nữa
+app = create_app()
 
-# 2. Tạo database mới
 with app.app_context():
+    # 1. Xóa toàn bộ bảng cũ
+    db.drop_all()
+    print(f"Đã xóa database cũ: {app.config['SQLALCHEMY_DATABASE_URI']}")
+
+    # 2. Tạo database mới
     db.create_all()
     print("Đã tạo bảng mới thành công (User, Book, Author,...)!")
     
     # (Tùy chọn) Tạo luôn dữ liệu mẫu ở đây nếu muốn
-    from app import create_sample_data
-    create_sample_data()
\ No newline at end of file
+    create_sample_data()
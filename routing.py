@@ -0,0 +1,125 @@
+import os
+import random
+import threading
+import time
+from functools import wraps
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+# ==============================================================================
+# ĐỊNH TUYẾN ĐỌC/GHI GIỮA DB CHÍNH VÀ CÁC REPLICA
+# - View gắn @read_only (chỉ với GET) được đọc từ một replica còn "đủ mới".
+# - Mọi lệnh ghi (flush) luôn đi vào DB chính.
+# - Sau khi một request ghi dữ liệu, người dùng đó được ghim vào DB chính trong
+#   REPLICA_PIN_SECONDS giây để luôn đọc thấy dữ liệu mình vừa ghi.
+# - Replica trễ hơn REPLICA_MAX_LAG giây hoặc lỗi kết nối sẽ bị bỏ qua; nếu không
+#   còn replica nào dùng được thì quay về DB chính.
+# ==============================================================================
+REPLICA_PREFIX = 'replica_'
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            key = g.get('db_replica')
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _mark_write(db_session):
+    if has_request_context():
+        g.db_wrote = True
+
+def read_only(f):
+    """Đánh dấu view chỉ đọc, được phép phục vụ từ replica"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        return f(*args, **kwargs)
+    decorated_function.read_only = True
+    return decorated_function
+
+# --- Theo dõi độ trễ replica (cache theo tiến trình) ---
+_lag_cache = {}
+_lag_lock = threading.Lock()
+
+def _sqlite_mtime(engine):
+    path = engine.url.database
+    if not path or path == ':memory:':
+        return None
+    mtimes = [os.path.getmtime(p) for p in (path, path + '-wal') if os.path.exists(p)]
+    return max(mtimes) if mtimes else None
+
+def measure_lag(primary, replica):
+    """Độ trễ (giây) của replica so với DB chính"""
+    if replica.dialect.name == 'sqlite':
+        # Replica là bản sao file: nếu DB chính được ghi sau lần đồng bộ cuối thì replica
+        # đang thiếu dữ liệu kể từ lúc đồng bộ đó, độ trễ tăng dần tới lần đồng bộ tiếp theo
+        primary_mtime, replica_mtime = _sqlite_mtime(primary), _sqlite_mtime(replica)
+        if replica_mtime is None:
+            raise RuntimeError(f'Không tìm thấy file replica {replica.url.database}')
+        if primary_mtime is None or primary_mtime <= replica_mtime:
+            return 0.0
+        return time.time() - replica_mtime
+    if replica.dialect.name == 'postgresql':
+        # Đã replay hết WAL nhận được thì không trễ, dù DB chính lâu không ghi (timestamp
+        # giao dịch cuối cứ cũ dần); chỉ khi còn WAL chờ replay mới tính theo timestamp
+        with replica.connect() as conn:
+            return float(conn.execute(sa.text(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0'
+                ' ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+            )).scalar())
+    # Dialect khác: chỉ kiểm tra kết nối được
+    with replica.connect() as conn:
+        conn.execute(sa.text('SELECT 1'))
+    return 0.0
+
+def replica_lag(key, engines):
+    """Độ trễ của replica, đo lại tối đa mỗi REPLICA_CHECK_INTERVAL giây; None nếu replica lỗi"""
+    now = time.monotonic()
+    with _lag_lock:
+        cached = _lag_cache.get(key)
+        if cached and now - cached[0] < current_app.config['REPLICA_CHECK_INTERVAL']:
+            return cached[1]
+    try:
+        lag = measure_lag(engines[None], engines[key])
+    except Exception as e:
+        current_app.logger.warning('Replica %s không dùng được: %s', key, e)
+        lag = None
+    with _lag_lock:
+        _lag_cache[key] = (now, lag)
+    return lag
+
+def choose_replica(engines):
+    max_lag = current_app.config['REPLICA_MAX_LAG']
+    keys = [k for k in engines if k and k.startswith(REPLICA_PREFIX)]
+    random.shuffle(keys)
+    for key in keys:
+        lag = replica_lag(key, engines)
+        if lag is not None and lag <= max_lag:
+            return key
+    return None
+
+def init_routing(app, db):
+    """Đăng ký các replica thành bind của Flask-SQLAlchemy, gọi trước db.init_app()"""
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for i, uri in enumerate(app.config.get('SQLALCHEMY_REPLICA_URIS') or []):
+        binds[f'{REPLICA_PREFIX}{i}'] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+    if not app.config.get('SQLALCHEMY_REPLICA_URIS'):
+        return
+
+    @app.before_request
+    def _route_reads():
+        view = app.view_functions.get(request.endpoint)
+        if request.method != 'GET' or not getattr(view, 'read_only', False):
+            return
+        if session.get('db_primary_until', 0) > time.time():
+            return
+        g.db_replica = choose_replica(db.engines)
+
+    @app.after_request
+    def _pin_after_write(response):
+        if g.get('db_wrote'):
+            session['db_primary_until'] = time.time() + app.config['REPLICA_PIN_SECONDS']
+        return response
@@ -0,0 +1,24 @@
+import sqlite3
+from sqlalchemy.engine import make_url
+from app import create_app
+
+# Chép DB chính sang các replica SQLite cục bộ (dùng để thử định tuyến đọc/ghi):
+#   DATABASE_REPLICA_URLS=sqlite:///replica1.db python sync_replicas.py
+# Chạy lại định kỳ (cron, vòng lặp shell...) để replica không trễ quá REPLICA_MAX_LAG.
+app = create_app()
+primary = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if primary.get_backend_name() != 'sqlite':
+    raise SystemExit('Chỉ đồng bộ được khi DB chính là SQLite.')
+
+src = sqlite3.connect(primary.database)
+for uri in app.config['SQLALCHEMY_REPLICA_URIS']:
+    replica = make_url(uri)
+    if replica.get_backend_name() != 'sqlite':
+        print(f"Bỏ qua {uri}: replica không phải SQLite, hãy dùng cơ chế replication của DB đó.")
+        continue
+    dst = sqlite3.connect(replica.database)
+    with dst:
+        src.backup(dst)  # sao chép nhất quán kể cả khi DB chính đang được ghi
+    dst.close()
+    print(f"Đã đồng bộ {primary.database} -> {replica.database}")
+src.close()
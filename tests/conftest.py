@@ -0,0 +1,38 @@
+import pytest
+from app import create_app, create_sample_data
+from config import TestingConfig
+from extensions import db
+from models import Book
+import routing
+
+def make_app(**overrides):
+    """Tạo app test với cấu hình TestingConfig, ghi đè bằng overrides"""
+    return create_app(type('Config', (TestingConfig,), overrides))
+
+def login(client, username='Admin1', password='Admin777', **kwargs):
+    return client.post('/login', data={'username': username, 'password': password}, **kwargs)
+
+def seed(app):
+    with app.app_context():
+        db.create_all()
+        create_sample_data()
+        db.session.add(Book(title='Số đỏ', author_id=1, category_id=1, language_id=1,
+                            total_quantity=3, available_quantity=3))
+        db.session.commit()
+
+@pytest.fixture(autouse=True)
+def clear_lag_cache():
+    routing._lag_cache.clear()
+    yield
+    routing._lag_cache.clear()
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(EVENT_ARCHIVE_FOLDER=str(tmp_path / 'archive'))
+    seed(app)
+    with app.app_context():
+        yield app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
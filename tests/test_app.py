@@ -0,0 +1,28 @@
+import pytest
+from app import create_app
+from extensions import db
+from models import Book
+from conftest import login, make_app, seed
+
+def test_production_requires_secret_key(monkeypatch):
+    from config import ProductionConfig
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError):
+        create_app('production')
+
+def test_test_instances_are_isolated():
+    first, second = make_app(), make_app()
+    seed(first)
+    seed(second)
+    with first.app_context():
+        db.session.add(Book(title='Chỉ ở app thứ nhất', author_id=1, category_id=1, language_id=1))
+        db.session.commit()
+        assert Book.query.count() == 2
+    with second.app_context():
+        assert Book.query.count() == 1
+
+def test_login_and_index(client):
+    assert login(client).status_code == 302
+    response = client.get('/')
+    assert response.status_code == 200
+    assert 'Số đỏ' in response.get_data(as_text=True)
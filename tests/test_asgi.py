@@ -0,0 +1,55 @@
+import asyncio
+import importlib
+import json
+import pytest
+from conftest import login, make_app, seed
+
+def call(app, path, query=b'', cookie=None):
+    """Gọi app ASGI một request GET, trả về (status, headers, body)"""
+    headers = [(b'host', b'localhost')] + ([(b'cookie', cookie.encode())] if cookie else [])
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query,
+             'headers': headers, 'client': ('127.0.0.1', 1234), 'server': ('localhost', 80)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return start['status'], dict(start['headers']), body
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    monkeypatch.setenv('LIBRARY_CONFIG', 'testing')
+    asgi = importlib.import_module('asgi')
+    flask_app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'library.db'}")
+    seed(flask_app)
+    client = flask_app.test_client()
+    login(client)
+    cookie = f"session={client.get_cookie('session').value}"
+    return asgi.create_asgi_app(flask_app), client, cookie
+
+def test_async_search_matches_flask_route(served):
+    app, client, cookie = served
+    status, headers, body = call(app, '/api/books', b'q_title=%C4%91%E1%BB%8F', cookie)
+    assert status == 200 and headers[b'content-type'] == b'application/json'
+    expected = client.get('/api/books?q_title=đỏ').get_json()
+    assert json.loads(body) == expected
+    assert [b['title'] for b in expected['books']] == ['Số đỏ']
+
+def test_async_search_without_login_falls_back_to_flask(served):
+    app, client, cookie = served
+    status, headers, body = call(app, '/api/books')
+    assert status == 302 and b'/login' in headers[b'location']
+    status, headers, body = call(app, '/api/books', cookie='session=gia-mao')
+    assert status == 302
+
+def test_flask_pages_still_served(served):
+    app, client, cookie = served
+    status, headers, body = call(app, '/', cookie=cookie)
+    assert status == 200 and 'Số đỏ' in body.decode()
@@ -0,0 +1,141 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+import pytest
+from archive_events import archive
+from events import read_archive, record, write_archive
+from extensions import db
+from models import Book, CirculationEvent
+from replay_events import iter_events, replay, snapshot, verify
+from conftest import login
+
+def test_archive_roundtrip(tmp_path):
+    events = [
+        {'id': 1, 'kind': 'stock_changed', 'created_at': datetime(2026, 1, 2, 3, 4, 5, 678901),
+         'user_id': None, 'book_id': 7, 'actor_id': 2, 'available_quantity': 0, 'total_quantity': 5},
+        {'id': 2, 'kind': 'borrowed', 'created_at': datetime(2026, 1, 3),
+         'user_id': 4, 'book_id': 7, 'actor_id': None, 'available_quantity': None, 'total_quantity': None},
+    ]
+    path = tmp_path / 'events.bin.gz'
+    write_archive(path, events)
+    assert list(read_archive(path)) == events
+
+def test_read_archive_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin.gz'
+    with gzip.open(path, 'wb') as f:
+        f.write(b'LEV0')
+    with pytest.raises(ValueError):
+        list(read_archive(path))
+
+def test_record_rejects_unknown_kind(app):
+    with pytest.raises(ValueError):
+        record('stolen', book_id=1)
+
+def test_failed_change_leaves_no_event(app):
+    record('borrowed', user_id=1, book_id=1)
+    db.session.rollback()
+    assert CirculationEvent.query.count() == 0
+
+def test_replay_matches_live_tables(app, client):
+    snapshot()
+    login(client)
+    client.get('/borrow_book/1')
+    log_id = db.session.execute(db.text('SELECT id FROM borrow_log')).scalar()
+    client.post('/add', data={'title': 'Mới', 'author_id': 1, 'category_id': 1, 'language_id': 1,
+                              'year': '', 'price': '', 'summary': '', 'quantity': '2'})
+    client.get('/borrow_book/2')
+    client.post('/update/2', data={'title': 'Mới', 'author_id': 1, 'category_id': 1, 'language_id': 1,
+                                   'year': '', 'price': '', 'summary': '', 'quantity': '4'})
+    client.get(f'/return_book/{log_id}')
+    client.get('/toggle_user/2')
+
+    stock, blocked, borrows, borrowers, kinds = replay(iter_events(app))
+    matched, uncovered, mismatches = verify(stock, blocked)
+    assert (matched, uncovered, mismatches) == (2, [], [])
+    assert stock == {1: [3, 3], 2: [3, 4]}
+    assert blocked == {2: True}
+    assert borrows == {1: 1, 2: 1}
+    assert kinds['returned'] == 1
+
+def test_verify_reports_drift(app):
+    snapshot()
+    db.session.get(Book, 1).available_quantity = 0
+    db.session.commit()
+    stock, blocked, *_ = replay(iter_events(app))
+    matched, uncovered, mismatches = verify(stock, blocked)
+    assert matched == 0 and len(mismatches) == 1
+
+def test_archive_keeps_replay_and_ids_unique(app, client):
+    snapshot()
+    first_path, count = archive(app, days=-1)
+    assert count == 1 and CirculationEvent.query.count() == 0
+    snapshot()  # bảng rỗng: id mới vẫn không được dùng lại
+    second_path, _ = archive(app, days=-1)
+    assert first_path != second_path
+    assert sorted(os.listdir(app.config['EVENT_ARCHIVE_FOLDER'])) == [
+        'events-0000000001-0000000001.bin.gz', 'events-0000000002-0000000002.bin.gz']
+
+    login(client)
+    client.get('/borrow_book/1')
+    stock, blocked, *_ = replay(iter_events(app))
+    assert verify(stock, blocked) == (1, [], [])
+
+def test_replay_skips_rows_already_archived(app, client, monkeypatch):
+    snapshot()
+    login(client)
+    client.get('/borrow_book/1')
+    # archive dừng giữa chừng: file đã ghi nhưng xóa khỏi bảng thất bại
+    monkeypatch.setattr(db.session, 'commit', lambda: (_ for _ in ()).throw(RuntimeError('crash')))
+    with pytest.raises(RuntimeError):
+        archive(app, days=-1)
+    monkeypatch.undo()
+    db.session.rollback()
+    assert CirculationEvent.query.count() == 2
+
+    stock, blocked, *_ = replay(iter_events(app))
+    assert stock[1] == [2, 3]  # lượt mượn không bị tính hai lần
+    assert verify(stock, blocked) == (1, [], [])
+
+    # Chạy lại chỉ dọn các dòng đã lưu trữ, không báo trùng file
+    assert archive(app, days=-1) == (None, 0)
+    assert CirculationEvent.query.count() == 0
+    stock, blocked, *_ = replay(iter_events(app))
+    assert verify(stock, blocked) == (1, [], [])
+
+def test_archive_cuts_by_id_not_created_at(app):
+    snapshot()  # id 1, created_at = bây giờ
+    record('borrowed', user_id=1, book_id=1)  # id 2
+    record('returned', user_id=1, book_id=1)  # id 3
+    db.session.commit()
+    # id 2 lấy created_at sớm hơn id 1 (tính trước khi chờ khóa ghi)
+    db.session.get(CirculationEvent, 2).created_at = datetime.utcnow() - timedelta(days=40)
+    db.session.commit()
+    path, count = archive(app, days=30)
+    assert count == 2
+    assert [e['id'] for e in read_archive(path)] == [1, 2]
+    assert [e['id'] for e in iter_events(app)] == [1, 2, 3]
+
+def test_archive_never_overwrites_existing_file(app):
+    snapshot()
+    os.makedirs(app.config['EVENT_ARCHIVE_FOLDER'])
+    path = os.path.join(app.config['EVENT_ARCHIVE_FOLDER'], 'events-0000000001-0000000001.bin.gz')
+    open(path, 'wb').close()
+    assert archive(app, days=-1) == (None, 0)
+    assert os.path.getsize(path) == 0
+
+def test_admin_privilege_changes_are_recorded(app, client):
+    login(client)
+    form = {'fullname': 'Người dùng', 'position': ''}
+    client.post('/update_user/3', data={**form, 'is_admin': 'y'})  # không đổi quyền
+    client.post('/update_user/2', data=form)
+    client.post('/update_user/2', data={**form, 'is_admin': 'y'})
+    client.post('/add_user', data={'username': 'user4', 'fullname': 'User 4', 'user_code': 'U4', 'password': 'x'})
+    client.post('/add_user', data={'username': 'admin5', 'fullname': 'Admin 5', 'user_code': 'A5',
+                                   'password': 'x', 'is_admin': 'y'})
+    events = [(e.kind, e.user_id, e.actor_id) for e in CirculationEvent.query.order_by(CirculationEvent.id)]
+    assert events == [
+        ('user_updated', 3, 1),
+        ('user_updated', 2, 1), ('user_demoted', 2, 1),
+        ('user_updated', 2, 1), ('user_promoted', 2, 1),
+        ('user_promoted', 5, 1),
+    ]
@@ -0,0 +1,64 @@
+import pytest
+import ratelimit
+from ratelimit import MemoryBackend, parse_limit
+from conftest import login, make_app, seed
+
+def test_parse_limit():
+    assert parse_limit('10/minute') == (10, 10 / 60)
+    assert parse_limit('1/second') == (1, 1.0)
+
+@pytest.mark.parametrize('limit', ['abc', '10', '10/fortnight', '0/minute', '-1/day'])
+def test_parse_limit_rejects_malformed(limit):
+    with pytest.raises(ValueError):
+        parse_limit(limit)
+
+def test_invalid_limit_fails_at_create_app():
+    with pytest.raises(ValueError, match='RATELIMIT_LOGIN'):
+        make_app(RATELIMIT_LOGIN='10/fortnight')
+
+def test_token_bucket_denies_then_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: now[0])
+    backend = MemoryBackend()
+    assert [backend.consume('k', 2, 1.0)[0] for _ in range(3)] == [True, True, False]
+    allowed, retry_after = backend.consume('k', 2, 1.0)
+    assert not allowed and retry_after == pytest.approx(1.0)
+    now[0] += 1.0
+    assert backend.consume('k', 2, 1.0)[0]
+    assert not backend.consume('k', 2, 1.0)[0]
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_keys=3)
+    for key in 'abc':
+        backend.consume(key, 1, 0.001)
+    backend.consume('a', 1, 0.001)  # a thành mới dùng gần nhất
+    backend.consume('d', 1, 0.001)
+    assert list(backend._buckets) == ['c', 'a', 'd']
+
+def test_disabled_in_testing_config(client):
+    assert all(login(client, password='sai').status_code == 200 for _ in range(15))
+
+def test_login_limited_per_ip_with_retry_after():
+    app = make_app(RATELIMIT_ENABLED=True, RATELIMIT_LOGIN='2/minute')
+    seed(app)
+    client = app.test_client()
+    assert [login(client, password='sai').status_code for _ in range(3)] == [200, 200, 429]
+    response = login(client)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert client.get('/login').status_code == 200  # chỉ giới hạn POST
+
+def test_proxy_fix_uses_forwarded_client_ip():
+    app = make_app(RATELIMIT_ENABLED=True, RATELIMIT_LOGIN='1/minute', PROXY_FIX_X_FOR=1)
+    seed(app)
+    client = app.test_client()
+    assert login(client, password='sai', headers={'X-Forwarded-For': '10.0.0.1'}).status_code == 200
+    assert login(client, password='sai', headers={'X-Forwarded-For': '10.0.0.1'}).status_code == 429
+    assert login(client, password='sai', headers={'X-Forwarded-For': '10.0.0.2'}).status_code == 200
+
+def test_write_endpoint_limited_per_user():
+    app = make_app(RATELIMIT_ENABLED=True, RATELIMIT_WRITE='2/minute')
+    seed(app)
+    client = app.test_client()
+    login(client)
+    assert [client.get('/toggle_wishlist/1').status_code for _ in range(3)] == [302, 302, 429]
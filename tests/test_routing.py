@@ -0,0 +1,75 @@
+import os
+import shutil
+import time
+import pytest
+from extensions import db
+from models import Book
+from routing import measure_lag
+from conftest import login, make_app, seed
+
+@pytest.fixture
+def replicated(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+                   SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{replica}'],
+                   REPLICA_MAX_LAG=60, REPLICA_CHECK_INTERVAL=0)
+    seed(app)
+    with app.app_context():
+        db.engine.dispose()
+    shutil.copy(primary, replica)
+    with app.app_context():
+        # Ghi sau lần đồng bộ: replica chưa có thay đổi này
+        db.session.get(Book, 1).title = 'Chỉ có ở DB chính'
+        db.session.commit()
+    return app, str(primary), str(replica)
+
+def set_mtime(path, when):
+    os.utime(path, (when, when))
+
+def test_lag_zero_when_replica_is_newer(replicated):
+    app, primary, replica = replicated
+    set_mtime(primary, time.time() - 10)
+    with app.app_context():
+        assert measure_lag(db.engines[None], db.engines['replica_0']) == 0
+
+def test_lag_counts_time_since_sync_after_write(replicated):
+    app, primary, replica = replicated
+    now = time.time()
+    set_mtime(replica, now - 30)
+    set_mtime(primary, now - 29.999)  # ghi ngay sau khi đồng bộ rồi dừng ghi
+    with app.app_context():
+        assert measure_lag(db.engines[None], db.engines['replica_0']) == pytest.approx(30, abs=1)
+
+def test_read_only_view_uses_replica_until_user_writes(replicated):
+    app, primary, replica = replicated
+    client = app.test_client()
+    login(client)
+    assert 'Số đỏ' in client.get('/').get_data(as_text=True)  # đọc từ replica (cũ)
+    client.get('/toggle_wishlist/1')
+    assert 'Chỉ có ở DB chính' in client.get('/').get_data(as_text=True)  # bị ghim vào DB chính
+
+def test_pin_expires(replicated):
+    app, primary, replica = replicated
+    app.config['REPLICA_PIN_SECONDS'] = 0
+    client = app.test_client()
+    login(client)
+    client.get('/toggle_wishlist/1')
+    set_mtime(replica, time.time() + 1)
+    assert 'Số đỏ' in client.get('/').get_data(as_text=True)
+
+def test_falls_back_to_primary_when_replica_lags(replicated):
+    app, primary, replica = replicated
+    app.config['REPLICA_MAX_LAG'] = 5
+    now = time.time()
+    set_mtime(replica, now - 60)
+    set_mtime(primary, now)
+    client = app.test_client()
+    login(client)
+    assert 'Chỉ có ở DB chính' in client.get('/').get_data(as_text=True)
+
+def test_falls_back_when_replica_missing(replicated):
+    app, primary, replica = replicated
+    os.remove(replica)
+    client = app.test_client()
+    login(client)
+    assert 'Chỉ có ở DB chính' in client.get('/').get_data(as_text=True)
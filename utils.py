@@ -0,0 +1,24 @@
+import os
+import secrets
+from functools import wraps
+from flask import redirect, url_for, flash
+from flask_login import current_user
+
+def save_picture(form_picture, folder_path):
+    # Thư mục upload chỉ được tạo khi thật sự lưu file, không tạo lúc import
+    os.makedirs(folder_path, exist_ok=True)
+    random_hex = secrets.token_hex(8)
+    _, f_ext = os.path.splitext(form_picture.filename)
+    picture_fn = random_hex + f_ext
+    picture_path = os.path.join(folder_path, picture_fn)
+    form_picture.save(picture_path)
+    return picture_fn
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.is_admin:
+            flash('Bạn không có quyền truy cập trang quản lý!', 'danger') # <-- Lỗi của bạn là đây
+            return redirect(url_for('books.index'))
+        return f(*args, **kwargs)
+    return decorated_function
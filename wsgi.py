@@ -0,0 +1,6 @@
+import os
+from app import create_app
+
+# Điểm vào WSGI cho môi trường production:
+#   gunicorn -c gunicorn.conf.py wsgi:app   (on_starting tự chạy init_db() để tạo bảng còn thiếu)
+app = create_app(os.environ.get('LIBRARY_CONFIG', 'production'))